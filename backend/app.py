@@ -2,26 +2,118 @@
 Flask Backend for Dynamic Ontology Visualization
 Loads JSON ontologies and serves graph data via REST API
 """
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
+import brotli
+from collections import Counter
+import gzip
+import hashlib
 import json
 import os
-from ontology_parser import OntologyParser
+import orjson
+from ontology_parser import OntologyParser, parse_ontology
+from ontology_store import OntologyStore
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster (de)serialization"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for frontend communication
 
-# Global state
+# Compress dynamic responses; cached payloads are pre-compressed on upload
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+# Compressing a streamed response buffers the whole body first
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
+
+# Global state: replaced as a whole on upload, never mutated in place, so
+# request handlers read it once and keep working on a consistent snapshot
 current_ontology = None
-parser = OntologyParser()
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 FRONTEND_FOLDER = '../frontend'
+STREAM_BATCH_SIZE = 256
+PRECOMPRESS_MIN_SIZE = 1024
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 
+def _json(payload, status: int = 200) -> Response:
+    """Serialize payload once with orjson and wrap it in a JSON response"""
+    return Response(
+        orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def _etag(body: bytes) -> str:
+    """Return a short content hash usable as an ETag"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def _cache_payload(payload) -> dict:
+    """Serialize payload once and keep its ETag and compressed variants"""
+    body = orjson.dumps(payload)
+    encoded = {}
+    if len(body) >= PRECOMPRESS_MIN_SIZE:
+        encoded['br'] = brotli.compress(body, quality=4)
+        encoded['gzip'] = gzip.compress(body, 6)
+
+    return {
+        'body': body,
+        'etag': _etag(body),
+        'encoded': encoded
+    }
+
+
+def _cached_json(cached: dict) -> Response:
+    """Serve a cached payload in the best accepted encoding, or 304 on ETag match"""
+    body = cached['body']
+    etag = cached['etag']
+    # Highest q-value wins, q=0 refuses an encoding; ties keep br first
+    encoding = request.accept_encodings.best_match(cached['encoded'])
+    if encoding:
+        body = cached['encoded'][encoding]
+        etag = f"{etag}-{encoding}"
+
+    response = Response(body, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if cached['encoded']:
+        response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def _compute_stats(store: OntologyStore) -> dict:
+    """Count nodes per category and edges per type"""
+    return {
+        'total_nodes': len(store.nodes),
+        'total_edges': len(store.edges),
+        'categories': dict(Counter(store.categories)),
+        'edge_types': dict(Counter(store.edge_types))
+    }
+
+
+# Categories are static, serialize them once at startup
+CATEGORIES_CACHE = _cache_payload({'categories': OntologyParser().get_categories()})
+
+
 def _sanitize_identifier(value: str) -> str:
     """Return a filesystem/path friendly identifier"""
     sanitized = ''.join(
@@ -124,7 +216,7 @@ def upload_ontology():
                 files = [single]
 
         if not files:
-            return jsonify({'error': 'No file provided'}), 400
+            return _json({'error': 'No file provided'}, 400)
 
         documents = []
         for uploaded in files:
@@ -132,12 +224,12 @@ def upload_ontology():
                 continue
 
             if not uploaded.filename.lower().endswith('.json'):
-                return jsonify({'error': f'File {uploaded.filename} must be a JSON file'}), 400
+                return _json({'error': f'File {uploaded.filename} must be a JSON file'}, 400)
 
             try:
-                json_data = json.load(uploaded)
-            except json.JSONDecodeError as e:
-                return jsonify({'error': f'Invalid JSON in {uploaded.filename}: {str(e)}'}), 400
+                json_data = orjson.loads(uploaded.stream.read())
+            except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
+                return _json({'error': f'Invalid JSON in {uploaded.filename}: {str(e)}'}, 400)
 
             documents.append({
                 'name': uploaded.filename,
@@ -145,78 +237,106 @@ def upload_ontology():
             })
 
         if not documents:
-            return jsonify({'error': 'No valid JSON files provided'}), 400
+            return _json({'error': 'No valid JSON files provided'}, 400)
 
+        source_files = [doc['name'] for doc in documents]
         payload = _prepare_payload(documents)
+        del documents
+
+        # Parse ontology (fresh parser per call, safe for concurrent uploads)
+        nodes, edges = parse_ontology(payload)
+
+        # Only the derived graph is kept, release the decoded input before
+        # building the caches so it does not add to the peak memory
+        del payload
 
-        # Parse ontology (new parser instance to avoid shared state)
-        parser_instance = OntologyParser()
-        nodes, edges = parser_instance.parse(payload)
+        store = OntologyStore.from_graph(nodes, edges)
 
-        # Store current ontology
+        # Serialize and compress immutable responses once, they only change on upload
+        graph_cache = _cache_payload({'nodes': nodes, 'edges': edges})
+        stats_cache = _cache_payload(_compute_stats(store))
+
+        # Swap in the fully built ontology in a single assignment
         current_ontology = {
-            'nodes': nodes,
-            'edges': edges,
-            'raw': payload,
-            'source_files': [doc['name'] for doc in documents]
+            'store': store,
+            'source_files': source_files,
+            'graph_cache': graph_cache,
+            'stats_cache': stats_cache
         }
 
-        return jsonify({
-            'message': f'Loaded {len(documents)} file(s) successfully',
+        return _json({
+            'message': f'Loaded {len(source_files)} file(s) successfully',
             'stats': {
                 'nodes': len(nodes),
                 'edges': len(edges)
             },
-            'files_processed': len(documents)
+            'files_processed': len(source_files)
         })
 
-    except json.JSONDecodeError as e:
-        return jsonify({'error': f'Invalid JSON: {str(e)}'}), 400
+    except (json.JSONDecodeError, orjson.JSONDecodeError) as e:
+        return _json({'error': f'Invalid JSON: {str(e)}'}, 400)
     except ValueError as e:
-        return jsonify({'error': str(e)}), 400
+        return _json({'error': str(e)}, 400)
     except Exception as e:
-        return jsonify({'error': f'Error processing ontology: {str(e)}'}), 500
+        return _json({'error': f'Error processing ontology: {str(e)}'}, 500)
 
 
 @app.route('/api/graph', methods=['GET'])
 def get_graph():
     """Get current graph data (nodes and edges)"""
-    if current_ontology is None:
-        return jsonify({'error': 'No ontology loaded'}), 404
+    ontology = current_ontology
+    if ontology is None:
+        return _json({'error': 'No ontology loaded'}, 404)
 
-    return jsonify({
-        'nodes': current_ontology['nodes'],
-        'edges': current_ontology['edges']
-    })
+    return _cached_json(ontology['graph_cache'])
+
+
+@app.route('/api/graph/stream', methods=['GET'])
+def stream_graph():
+    """Stream graph data in batches instead of building one response body"""
+    ontology = current_ontology
+    if ontology is None:
+        return _json({'error': 'No ontology loaded'}, 404)
+
+    def _batches(items):
+        for start in range(0, len(items), STREAM_BATCH_SIZE):
+            chunk = b','.join(
+                orjson.dumps(item)
+                for item in items[start:start + STREAM_BATCH_SIZE]
+            )
+            yield chunk if start == 0 else b',' + chunk
+
+    def generate():
+        yield b'{"nodes":['
+        yield from _batches(ontology['store'].nodes)
+        yield b'],"edges":['
+        yield from _batches(ontology['store'].edges)
+        yield b']}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
     """Get list of available categories"""
-    categories = parser.get_categories()
-    return jsonify({'categories': categories})
+    return _cached_json(CATEGORIES_CACHE)
 
 
 @app.route('/api/node/<path:node_id>', methods=['GET'])
 def get_node(node_id):
     """Get details for a specific node"""
-    if current_ontology is None:
-        return jsonify({'error': 'No ontology loaded'}), 404
+    ontology = current_ontology
+    if ontology is None:
+        return _json({'error': 'No ontology loaded'}, 404)
 
-    # Find node by ID
-    node = next(
-        (n for n in current_ontology['nodes'] if n['data']['id'] == node_id),
-        None
-    )
+    found = ontology['store'].get_node(node_id)
 
-    if node is None:
-        return jsonify({'error': 'Node not found'}), 404
+    if found is None:
+        return _json({'error': 'Node not found'}, 404)
 
-    # Get connected edges
-    incoming = [e for e in current_ontology['edges'] if e['data']['target'] == node_id]
-    outgoing = [e for e in current_ontology['edges'] if e['data']['source'] == node_id]
+    node, incoming, outgoing = found
 
-    return jsonify({
+    return _json({
         'node': node,
         'incoming_edges': incoming,
         'outgoing_edges': outgoing
@@ -226,57 +346,42 @@ def get_node(node_id):
 @app.route('/api/search', methods=['GET'])
 def search_nodes():
     """Search nodes by query string"""
-    if current_ontology is None:
-        return jsonify({'error': 'No ontology loaded'}), 404
+    ontology = current_ontology
+    if ontology is None:
+        return _json({'error': 'No ontology loaded'}, 404)
 
     query = request.args.get('q', '').lower()
 
     if not query:
-        return jsonify({'results': []})
+        return _json({'results': []})
 
     # Search in node labels and paths
-    results = [
-        node for node in current_ontology['nodes']
-        if query in node['data']['label'].lower() or
-           query in node['data']['path'].lower()
-    ]
+    results = ontology['store'].search(query)
 
-    return jsonify({'results': results})
+    return _json({'results': results})
 
 
 @app.route('/api/filter', methods=['POST'])
 def filter_nodes():
     """Filter nodes by categories"""
-    if current_ontology is None:
-        return jsonify({'error': 'No ontology loaded'}), 404
+    ontology = current_ontology
+    if ontology is None:
+        return _json({'error': 'No ontology loaded'}, 404)
 
     data = request.get_json()
-    enabled_categories = data.get('categories', [])
+    enabled_categories = data.get('categories', []) if isinstance(data, dict) else None
 
-    if not enabled_categories:
-        return jsonify({
-            'nodes': current_ontology['nodes'],
-            'edges': current_ontology['edges']
-        })
+    if not isinstance(enabled_categories, list) or not all(
+        isinstance(category, str) for category in enabled_categories
+    ):
+        return _json({'error': 'categories must be a list of strings'}, 400)
 
-    # Filter nodes
-    filtered_nodes = [
-        node for node in current_ontology['nodes']
-        if node['data']['category'] in enabled_categories or
-           node['data']['category'] == 'root'
-    ]
-
-    # Get IDs of visible nodes
-    visible_ids = {node['data']['id'] for node in filtered_nodes}
+    if not enabled_categories:
+        return _cached_json(ontology['graph_cache'])
 
-    # Filter edges (only show if both source and target are visible)
-    filtered_edges = [
-        edge for edge in current_ontology['edges']
-        if edge['data']['source'] in visible_ids and
-           edge['data']['target'] in visible_ids
-    ]
+    filtered_nodes, filtered_edges = ontology['store'].filter(enabled_categories)
 
-    return jsonify({
+    return _json({
         'nodes': filtered_nodes,
         'edges': filtered_edges
     })
@@ -285,32 +390,17 @@ def filter_nodes():
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get statistics about current ontology"""
-    if current_ontology is None:
-        return jsonify({'error': 'No ontology loaded'}), 404
-
-    # Calculate statistics
-    categories = {}
-    for node in current_ontology['nodes']:
-        cat = node['data']['category']
-        categories[cat] = categories.get(cat, 0) + 1
-
-    edge_types = {}
-    for edge in current_ontology['edges']:
-        edge_type = edge['data']['type']
-        edge_types[edge_type] = edge_types.get(edge_type, 0) + 1
-
-    return jsonify({
-        'total_nodes': len(current_ontology['nodes']),
-        'total_edges': len(current_ontology['edges']),
-        'categories': categories,
-        'edge_types': edge_types
-    })
+    ontology = current_ontology
+    if ontology is None:
+        return _json({'error': 'No ontology loaded'}, 404)
+
+    return _cached_json(ontology['stats_cache'])
 
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return _json({
         'status': 'healthy',
         'ontology_loaded': current_ontology is not None
     })
@@ -326,6 +416,7 @@ if __name__ == '__main__':
     print("  API Endpoints:")
     print("    - POST /api/upload        : Upload ontology JSON")
     print("    - GET  /api/graph         : Get graph data")
+    print("    - GET  /api/graph/stream  : Stream graph data")
     print("    - GET  /api/categories    : Get categories")
     print("    - GET  /api/node/<id>     : Get node details")
     print("    - GET  /api/search?q=...  : Search nodes")
@@ -336,4 +427,5 @@ if __name__ == '__main__':
     print("=" * 60)
     print()
 
-    app.run(debug=True, host='0.0.0.0', port=8000)
+    from waitress import serve
+    serve(app, host='0.0.0.0', port=8000, threads=8)
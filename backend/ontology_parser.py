@@ -2,13 +2,37 @@
 Dynamic Ontology Parser
 Reads JSON ontology files and automatically generates graph nodes and edges
 """
-import json
+import re
+from functools import lru_cache
+from sys import intern
 from typing import Dict, List, Any, Tuple, Optional
 
+# Characters ignored when fuzzy matching names against node labels
+_NAME_NOISE = str.maketrans('', '', '_ -')
+
+# Shared edge type / CSS class for parent-child edges
+HIERARCHICAL_CLASS = 'hierarchical'
+
+
+class _ColorMap(dict):
+    """Category colors; unknown categories get the 'other' color"""
+
+    def __missing__(self, category: str) -> str:
+        return dict.__getitem__(self, 'other')
+
 
 class OntologyParser:
     """Parses ontology JSON and generates graph structure dynamically"""
 
+    __slots__ = (
+        'nodes',
+        'edges',
+        '_label_index',
+        '_label_keys',
+        '_node_ids',
+        '_nodes_by_suffix'
+    )
+
     # Category detection keywords
     CATEGORY_KEYWORDS = {
         'machine_components': ['component', 'unit', 'system', 'hardware', 'equipment'],
@@ -25,8 +49,104 @@ class OntologyParser:
         'human_factors_and_skills': ['human', 'skill', 'operator', 'training', 'competence']
     }
 
+    # Keywords as ordered tuples, scanned in declaration order without
+    # going through dict views on every call
+    _CATEGORY_KEYWORDS_TUPLE = tuple(
+        (category, tuple(keywords)) for category, keywords in CATEGORY_KEYWORDS.items()
+    )
+
+    # Instance types (lowercased, without underscores) that are machine components
+    _COMPONENT_TYPES = (
+        'machine', 'screwbarrelassembly', 'heatingsystem', 'injectiondrive',
+        'fixedplaten', 'movingplaten', 'tiebars', 'guidebushings',
+        'clampingmechanism', 'ejectorsystem', 'pump', 'valveset',
+        'actuator', 'heatexchanger', 'filter',
+        'controller', 'hmi', 'sensorset', 'sensor', 'temperaturesensor',
+        'mold'
+    )
+    _COMPONENT_RE = re.compile('|'.join(_COMPONENT_TYPES))
+
+    # Relationship sections turned into relational edges
+    _REL_TYPES = frozenset((
+        'causal_relationships',
+        'functional_dependencies',
+        'temporal_relationships',
+        'spatial_relationships',
+        'part_of',
+        'uses',
+        'affects'
+    ))
+
+    # Instance label extractors, tried in order against the instance type.
+    # Each entry is (type substrings, extractor(instance_data, instance_type));
+    # an empty result falls through to the next matching entry.
+    _LABEL_EXTRACTORS = (
+        (('Failure', 'Anomaly'), lambda d, t: d.get('failure_name', '')),
+        (('MaintenanceTask', 'MaintenanceEvent'), lambda d, t: d.get('description', '')),
+        (('Machine',), lambda d, t: (
+            f"{d.get('manufacturer', '')} {d.get('model', '')}"
+            if d.get('model', '') and d.get('manufacturer', '') else d.get('model', '')
+        )),
+        (('Material',), lambda d, t: d.get('material_name', '')),
+        (('SparePart',), lambda d, t: d.get('part_name', '')),
+        (('HydraulicOil',), lambda d, t: (
+            f"Hydraulic Oil {d['oil_type']}" if d.get('oil_type', '') else "Hydraulic Oil"
+        )),
+        (('Mold',), lambda d, t: d.get('mold_id', '')),
+        (('TemperatureSensor',), lambda d, t: (
+            f"Temperature Sensor {d['zone'].replace('_', ' ').title()}" if d.get('zone', '') else None
+        )),
+        (('ClampingMechanism',), lambda d, t: (
+            f"{d['mechanism_type'].replace('_', ' ').title()} Clamping Mechanism"
+            if d.get('mechanism_type', '') else "Clamping Mechanism"
+        )),
+        (('EjectorSystem',), lambda d, t: (
+            f"{d['system_type'].title()} Ejector System" if d.get('system_type', '') else "Ejector System"
+        )),
+        (('Pump',), lambda d, t: (
+            f"{d['pump_type'].replace('_', ' ').title()} Pump" if d.get('pump_type', '') else "Hydraulic Pump"
+        )),
+        (('ValveSet',), lambda d, t: (
+            f"{d['valve_type'].title()} Valve Set" if d.get('valve_type', '') else "Valve Set"
+        )),
+        (('Actuator',), lambda d, t: (
+            f"{d['actuator_function'].replace('_', ' ').title()} Actuator"
+            if d.get('actuator_function', '') else "Hydraulic Actuator"
+        )),
+        (('HeatExchanger',), lambda d, t: "Heat Exchanger"),
+        (('Filter',), lambda d, t: (
+            f"{d['filter_function'].title()} Filter" if d.get('filter_function', '') else "Hydraulic Filter"
+        )),
+        (('Controller',), lambda d, t: (
+            f"{d['controller_type'].upper()} Controller" if d.get('controller_type', '') else "PLC Controller"
+        )),
+        (('HMI',), lambda d, t: f"{d['hmi_type'].title()} HMI" if d.get('hmi_type', '') else "HMI Panel"),
+        (('SensorSet',), lambda d, t: (
+            f"{d['sensor_function'].title()} Sensors" if d.get('sensor_function', '') else "Sensor Set"
+        )),
+        # Generic sensors, temperature sensors are labelled by zone above
+        (('Sensor',), lambda d, t: None if 'Temperature' in t else (
+            f"{d['sensor_function'].replace('_', ' ').title()} Sensor"
+            if d.get('sensor_function', '') else "Sensor"
+        )),
+        (('ScrewBarrelAssembly',), lambda d, t: "Screw & Barrel Assembly"),
+        (('HeatingSystem',), lambda d, t: "Barrel Heating System"),
+        (('InjectionDrive',), lambda d, t: (
+            f"{d['drive_type'].title()} Injection Drive" if d.get('drive_type', '') else "Injection Drive"
+        )),
+        (('FixedPlaten',), lambda d, t: "Fixed Platen"),
+        (('MovingPlaten',), lambda d, t: "Moving Platen"),
+        (('TieBars',), lambda d, t: (
+            f"Tie Bars Set ({d['count']} bars)" if d.get('count', '') else "Tie Bars"
+        )),
+        (('GuideBushings',), lambda d, t: "Guide Bushings"),
+    )
+
+    # Edge definition keys that are not copied into edge data
+    _EDGE_DEF_RESERVED = frozenset(('source', 'target', 'type', 'id', 'label'))
+
     # Category colors
-    CATEGORY_COLORS = {
+    CATEGORY_COLORS = _ColorMap({
         'machine_components': '#3b82f6',
         'maintenance_activities': '#10b981',
         'process_parameters': '#f59e0b',
@@ -41,12 +161,15 @@ class OntologyParser:
         'human_factors_and_skills': '#84cc16',
         'root': '#64748b',
         'other': '#9ca3af'
-    }
+    })
 
     def __init__(self):
         self.nodes = []
         self.edges = []
-        self.node_counter = 0
+        self._label_index: Dict[str, str] = {}
+        self._label_keys: List[Tuple[str, str]] = []
+        self._node_ids: set = set()
+        self._nodes_by_suffix: Dict[str, List[str]] = {}
 
     def parse(self, json_data: Dict[str, Any]) -> Tuple[List[Dict], List[Dict]]:
         """
@@ -60,7 +183,10 @@ class OntologyParser:
         """
         self.nodes = []
         self.edges = []
-        self.node_counter = 0
+        self._label_index = {}
+        self._label_keys = []
+        self._node_ids = set()
+        self._nodes_by_suffix = {}
 
         # Find the root ontology object
         root_key, root_data = self._find_root(json_data)
@@ -69,11 +195,10 @@ class OntologyParser:
             root_key = root_key or 'ontology'
             root_data = json_data if isinstance(json_data, dict) else {}
 
-        classes_data = self._get_section(root_data, json_data, 'classes')
-        instances_data = self._get_section(root_data, json_data, 'instances')
-        instance_metadata = json_data.get('machine_instance') if isinstance(
-            json_data.get('machine_instance'), dict
-        ) else None
+        classes_data, instances_data, instance_metadata, edges_data = self._probe_sections(
+            root_data,
+            json_data
+        )
 
         content_types = []
         if classes_data:
@@ -86,10 +211,12 @@ class OntologyParser:
         if classes_data and not (instances_data or instance_metadata):
             root_node = self._create_root_node(root_key, root_data, content_types)
             self.nodes.append(root_node)
+            self._index_node(root_node['data']['label'], 'root')
         elif not instances_data and not instance_metadata:
             # Fallback: create root if we have nothing else
             root_node = self._create_root_node(root_key, root_data, content_types)
             self.nodes.append(root_node)
+            self._index_node(root_node['data']['label'], 'root')
 
         # Process optional machine instance metadata (ABox)
         if instance_metadata:
@@ -114,13 +241,6 @@ class OntologyParser:
             self._process_instances(instances_data)
 
         # Process explicit edges if available
-        # Check for edges in root_data first, then fallback to json_data
-        edges_data = None
-        for source in (root_data, json_data):
-            if isinstance(source, dict) and 'edges' in source and isinstance(source['edges'], list):
-                edges_data = source['edges']
-                break
-
         if edges_data:
             self._process_explicit_edges(edges_data)
 
@@ -144,22 +264,37 @@ class OntologyParser:
 
         # If no known root, take the first object-type value
         for key, value in json_data.items():
-            if isinstance(value, dict):
+            if type(value) is dict:
                 return key, value
 
         return None, None
 
-    def _get_section(
+    def _probe_sections(
         self,
-        primary: Optional[Dict[str, Any]],
-        fallback: Optional[Dict[str, Any]],
-        key: str
-    ) -> Optional[Dict[str, Any]]:
-        """Return a named section searching root data first, then full JSON"""
-        for source in (primary, fallback):
-            if isinstance(source, dict) and key in source and isinstance(source[key], dict):
-                return source[key]
-        return None
+        root_data: Dict[str, Any],
+        json_data: Dict[str, Any]
+    ) -> Tuple[Optional[Dict], Optional[Dict], Optional[Dict], Optional[List]]:
+        """Find the classes, instances, machine_instance and edges sections
+
+        classes, instances and edges are taken from root data first, then
+        the full JSON; machine_instance is only read from the full JSON.
+        """
+        classes = instances = edges = None
+        for source in (root_data, json_data):
+            if type(source) is not dict:
+                continue
+            if classes is None and type(source.get('classes')) is dict:
+                classes = source['classes']
+            if instances is None and type(source.get('instances')) is dict:
+                instances = source['instances']
+            if edges is None and type(source.get('edges')) is list:
+                edges = source['edges']
+
+        machine_instance = json_data.get('machine_instance')
+        if type(machine_instance) is not dict:
+            machine_instance = None
+
+        return classes, instances, machine_instance, edges
 
     def _create_root_node(
         self,
@@ -200,63 +335,104 @@ class OntologyParser:
         return properties
 
     def _process_classes(self, classes: Dict, parent_id: str, parent_path: str, node_type: str):
-        """Recursively process classes and create nodes"""
-        for key, value in classes.items():
-            node_id = f"{parent_path}.{key}"
-            category = self._determine_category(key, parent_path)
-            is_leaf = not self._is_complex_object(value)
+        """Walk classes depth-first with an explicit stack and create nodes"""
+        # Bind hot attributes to locals once for the whole walk
+        nodes_append = self.nodes.append
+        edges_append = self.edges.append
+        colors = self.CATEGORY_COLORS
+        fmt = self._format_label
+        categories = _CATEGORIES_BY_RANK
+        keyword_rank = _keyword_rank
+        iscx = self._is_complex_object
+        extract = self._extract_properties
+        index_node = self._index_node
+
+        # Each entry holds the pending (key, value, has_nested) children of one
+        # level, so nodes are emitted in the same pre-order a recursive walk
+        # would produce. has_nested is computed once per value: it decides the
+        # node's own size and descent, and which properties its parent keeps.
+        # Keywords never contain '.', so a path's category rank is the best
+        # rank of its segments; it rides along so each node only ranks its key.
+        stack = [(
+            ((key, value, iscx(value)) for key, value in classes.items()),
+            parent_id,
+            parent_path,
+            min(map(keyword_rank, parent_path.split('.')))
+        )]
+
+        while stack:
+            children, parent_id, parent_path, path_rank = stack[-1]
+            item = next(children, None)
+            if item is None:
+                stack.pop()
+                continue
+
+            key, value, has_nested = item
+            node_id = intern(f"{parent_path}.{key}")
+            rank = min(keyword_rank(key), path_rank)
+            category = categories[rank]
+            label = fmt(key)
+
+            if has_nested:
+                children = [(k, v, iscx(v)) for k, v in value.items()]
+                if any(nested for _, _, nested in children):
+                    properties = {k: v for k, v, nested in children if not nested}
+                else:
+                    properties = value
+            else:
+                properties = extract(value)
 
             # Create node
-            node = {
+            nodes_append({
                 'data': {
                     'id': node_id,
-                    'label': self._format_label(key),
+                    'label': label,
                     'category': category,
-                    'color': self.CATEGORY_COLORS.get(category, self.CATEGORY_COLORS['other']),
-                    'size': 30 if is_leaf else 40,
+                    'color': colors[category],
+                    'size': 40 if has_nested else 30,
                     'path': node_id,
-                    'properties': self._extract_properties(value),
+                    'properties': properties,
                     'node_type': node_type
                 }
-            }
-            self.nodes.append(node)
+            })
+            index_node(label, node_id)
 
             # Create hierarchical edge
-            edge = {
+            edges_append({
                 'data': {
                     'id': f"{parent_id}-{node_id}",
                     'source': parent_id,
                     'target': node_id,
-                    'type': 'hierarchical'
+                    'type': HIERARCHICAL_CLASS
                 },
-                'classes': 'hierarchical'
-            }
-            self.edges.append(edge)
-
-            # Recurse if value is a complex object
-            if isinstance(value, dict):
-                has_nested = any(
-                    isinstance(v, dict) and not isinstance(v, list)
-                    for v in value.values()
-                )
+                'classes': HIERARCHICAL_CLASS
+            })
 
-                if has_nested:
-                    self._process_classes(value, node_id, node_id, node_type)
+            # Descend into complex objects before the remaining siblings
+            if has_nested:
+                stack.append((iter(children), node_id, node_id, rank))
 
     def _process_instances(self, instances: Dict):
         """Process instances and create flat nodes (not recursive)"""
+        # Bind hot attributes to locals once for the whole loop
+        nodes_append = self.nodes.append
+        colors = self.CATEGORY_COLORS
+        categorize = self._categorize_instance_type
+        get_label = self._get_instance_label
+        index_node = self._index_node
+
         for instance_id, instance_data in instances.items():
-            if not isinstance(instance_data, dict):
+            if type(instance_data) is not dict:
                 continue
 
             # Use the instance ID directly as the node ID
-            node_id = f"root.instances.{instance_id}"
+            node_id = intern(f"root.instances.{instance_id}")
 
             # Get the instance type
             instance_type = instance_data.get('type', 'Instance')
 
             # Determine category based on type
-            category = self._categorize_instance_type(instance_type)
+            category = categorize(instance_type)
 
             # Extract all properties (including 'type')
             properties = {}
@@ -265,7 +441,7 @@ class OntologyParser:
                 properties[key] = value
 
             # Determine human-readable label
-            label = self._get_instance_label(instance_id, instance_data)
+            label = get_label(instance_id, instance_data)
 
             # Create node
             node = {
@@ -273,45 +449,36 @@ class OntologyParser:
                     'id': node_id,
                     'label': label,
                     'category': category,
-                    'color': self.CATEGORY_COLORS.get(category, self.CATEGORY_COLORS['other']),
+                    'color': colors[category],
                     'size': 40,
                     'path': node_id,
                     'properties': properties,
                     'node_type': 'instance'
                 }
             }
-            self.nodes.append(node)
+            nodes_append(node)
+            index_node(label, node_id)
 
             # NO hierarchical edge from root - instances are standalone
 
     def _categorize_instance_type(self, instance_type: str) -> str:
         """Map instance type to category"""
-        type_lower = instance_type.lower()
+        normalized = instance_type.lower().replace('_', '')
 
         # Machine components mapping
-        component_types = [
-            'machine', 'screwbarrelassembly', 'heatingsystem', 'injectiondrive',
-            'fixedplaten', 'movingplaten', 'tiebars', 'guidebushings',
-            'clampingmechanism', 'ejectorsystem', 'pump', 'valveset',
-            'actuator', 'heatexchanger', 'filter',
-            'controller', 'hmi', 'sensorset', 'sensor', 'temperaturesensor',
-            'mold'
-        ]
-
-        for comp_type in component_types:
-            if comp_type in type_lower.replace('_', ''):
-                return 'machine_components'
+        if self._COMPONENT_RE.search(normalized):
+            return 'machine_components'
 
         # Failures and anomalies
-        if 'failure' in type_lower.replace('_', '') or 'anomaly' in type_lower.replace('_', ''):
+        if 'failure' in normalized or 'anomaly' in normalized:
             return 'failures_and_anomalies'
 
         # Maintenance tasks and events
-        if 'maintenancetask' in type_lower.replace('_', '') or 'maintenanceevent' in type_lower.replace('_', ''):
+        if 'maintenancetask' in normalized or 'maintenanceevent' in normalized:
             return 'maintenance_activities'
 
         # Materials and spare parts (including hydraulic oil)
-        if 'material' in type_lower.replace('_', '') or 'hydraulicoil' in type_lower.replace('_', '') or 'sparepart' in type_lower.replace('_', ''):
+        if 'material' in normalized or 'hydraulicoil' in normalized or 'sparepart' in normalized:
             return 'spare_parts_and_inventory'
 
         # Default to other
@@ -321,165 +488,15 @@ class OntologyParser:
         """Generate human-readable label for an instance"""
         instance_type = instance_data.get('type', '')
 
-        # For Failure, use failure_name
-        if 'Failure' in instance_type or 'Anomaly' in instance_type:
-            failure_name = instance_data.get('failure_name', '')
-            if failure_name:
-                return failure_name
-
-        # For MaintenanceTask, use description
-        if 'MaintenanceTask' in instance_type or 'MaintenanceEvent' in instance_type:
-            description = instance_data.get('description', '')
-            if description:
-                return description
-
-        # For Machine, use model or manufacturer + model
-        if 'Machine' in instance_type:
-            model = instance_data.get('model', '')
-            manufacturer = instance_data.get('manufacturer', '')
-            if model and manufacturer:
-                return f"{manufacturer} {model}"
-            elif model:
-                return model
-
-        # For Material, use material_name
-        if 'Material' in instance_type:
-            material_name = instance_data.get('material_name', '')
-            if material_name:
-                return material_name
-
-        # For SparePart, use part_name
-        if 'SparePart' in instance_type:
-            part_name = instance_data.get('part_name', '')
-            if part_name:
-                return part_name
-
-        # For HydraulicOil
-        if 'HydraulicOil' in instance_type:
-            oil_type = instance_data.get('oil_type', '')
-            if oil_type:
-                return f"Hydraulic Oil {oil_type}"
-            return "Hydraulic Oil"
-
-        # For Mold, use mold_id
-        if 'Mold' in instance_type:
-            mold_id = instance_data.get('mold_id', '')
-            if mold_id:
-                return mold_id
-
-        # For TemperatureSensor, use zone
-        if 'TemperatureSensor' in instance_type:
-            zone = instance_data.get('zone', '')
-            if zone:
-                return f"Temperature Sensor {zone.replace('_', ' ').title()}"
-
-        # For ClampingMechanism
-        if 'ClampingMechanism' in instance_type:
-            mechanism_type = instance_data.get('mechanism_type', '')
-            if mechanism_type:
-                return f"{mechanism_type.replace('_', ' ').title()} Clamping Mechanism"
-            return "Clamping Mechanism"
-
-        # For EjectorSystem
-        if 'EjectorSystem' in instance_type:
-            system_type = instance_data.get('system_type', '')
-            if system_type:
-                return f"{system_type.title()} Ejector System"
-            return "Ejector System"
-
-        # For Pump
-        if 'Pump' in instance_type:
-            pump_type = instance_data.get('pump_type', '')
-            if pump_type:
-                return f"{pump_type.replace('_', ' ').title()} Pump"
-            return "Hydraulic Pump"
-
-        # For ValveSet
-        if 'ValveSet' in instance_type:
-            valve_type = instance_data.get('valve_type', '')
-            if valve_type:
-                return f"{valve_type.title()} Valve Set"
-            return "Valve Set"
-
-        # For Actuator
-        if 'Actuator' in instance_type:
-            function = instance_data.get('actuator_function', '')
-            if function:
-                return f"{function.replace('_', ' ').title()} Actuator"
-            return "Hydraulic Actuator"
-
-        # For HeatExchanger
-        if 'HeatExchanger' in instance_type:
-            return "Heat Exchanger"
-
-        # For Filter
-        if 'Filter' in instance_type:
-            filter_function = instance_data.get('filter_function', '')
-            if filter_function:
-                return f"{filter_function.title()} Filter"
-            return "Hydraulic Filter"
-
-        # For Controller
-        if 'Controller' in instance_type:
-            controller_type = instance_data.get('controller_type', '')
-            if controller_type:
-                return f"{controller_type.upper()} Controller"
-            return "PLC Controller"
-
-        # For HMI
-        if 'HMI' in instance_type:
-            hmi_type = instance_data.get('hmi_type', '')
-            if hmi_type:
-                return f"{hmi_type.title()} HMI"
-            return "HMI Panel"
-
-        # For SensorSet
-        if 'SensorSet' in instance_type:
-            sensor_function = instance_data.get('sensor_function', '')
-            if sensor_function:
-                return f"{sensor_function.title()} Sensors"
-            return "Sensor Set"
-
-        # For Sensor (generic)
-        if 'Sensor' in instance_type and 'Temperature' not in instance_type:
-            sensor_function = instance_data.get('sensor_function', '')
-            if sensor_function:
-                return f"{sensor_function.replace('_', ' ').title()} Sensor"
-            return "Sensor"
-
-        # For ScrewBarrelAssembly
-        if 'ScrewBarrelAssembly' in instance_type:
-            return "Screw & Barrel Assembly"
-
-        # For HeatingSystem
-        if 'HeatingSystem' in instance_type:
-            return "Barrel Heating System"
-
-        # For InjectionDrive
-        if 'InjectionDrive' in instance_type:
-            drive_type = instance_data.get('drive_type', '')
-            if drive_type:
-                return f"{drive_type.title()} Injection Drive"
-            return "Injection Drive"
-
-        # For FixedPlaten
-        if 'FixedPlaten' in instance_type:
-            return "Fixed Platen"
-
-        # For MovingPlaten
-        if 'MovingPlaten' in instance_type:
-            return "Moving Platen"
-
-        # For TieBars
-        if 'TieBars' in instance_type:
-            count = instance_data.get('count', '')
-            if count:
-                return f"Tie Bars Set ({count} bars)"
-            return "Tie Bars"
-
-        # For GuideBushings
-        if 'GuideBushings' in instance_type:
-            return "Guide Bushings"
+        # First matching extractor that yields a label wins
+        for keywords, extract in self._LABEL_EXTRACTORS:
+            for keyword in keywords:
+                if keyword in instance_type:
+                    label = extract(instance_data, instance_type)
+                    if label:
+                        # Ids such as mold_id may be numeric in the ABox
+                        return str(label)
+                    break
 
         # For components with specific names, try to use descriptive properties
         # Otherwise use the instance_id
@@ -487,44 +504,41 @@ class OntologyParser:
 
     def _process_relationships(self, relationships: Dict):
         """Process relationships to create relational edges"""
-        relationship_types = [
-            'causal_relationships',
-            'functional_dependencies',
-            'temporal_relationships',
-            'spatial_relationships',
-            'part_of',
-            'uses',
-            'affects'
-        ]
+        rel_types = self._REL_TYPES
+        create_edge = self._create_relational_edge
+        new_edges = []
 
-        for rel_type in relationship_types:
-            if rel_type not in relationships:
+        # Walk the input once, in its own order, skipping unknown sections
+        for rel_type, rels in relationships.items():
+            if rel_type not in rel_types:
                 continue
 
-            rels = relationships[rel_type]
-
             # Handle both list and dict formats
-            if isinstance(rels, list):
-                for idx, rel in enumerate(rels):
-                    self._create_relational_edge(rel, rel_type, idx)
-            elif isinstance(rels, dict):
-                for idx, (key, rel) in enumerate(rels.items()):
-                    if isinstance(rel, dict):
-                        self._create_relational_edge(rel, rel_type, idx)
-
-    def _create_relational_edge(self, rel: Dict, rel_type: str, idx: int):
-        """Create a relational edge between nodes"""
+            if type(rels) is list:
+                new_edges.extend(create_edge(rel, rel_type, idx) for idx, rel in enumerate(rels))
+            elif type(rels) is dict:
+                new_edges.extend(
+                    create_edge(rel, rel_type, idx)
+                    for idx, rel in enumerate(rels.values())
+                    if type(rel) is dict
+                )
+
+        # Unresolved relationships come back as None
+        self.edges.extend(edge for edge in new_edges if edge is not None)
+
+    def _create_relational_edge(self, rel: Dict, rel_type: str, idx: int) -> Optional[Dict]:
+        """Build a relational edge between nodes, or None if either end is unknown"""
         source = rel.get('source')
         target = rel.get('target')
 
         if not source or not target:
-            return
+            return None
 
         source_id = self._find_node_by_name(source)
         target_id = self._find_node_by_name(target)
 
         if source_id and target_id:
-            edge = {
+            return {
                 'data': {
                     'id': f"rel-{rel_type}-{idx}",
                     'source': source_id,
@@ -534,78 +548,94 @@ class OntologyParser:
                 },
                 'classes': 'relational'
             }
-            self.edges.append(edge)
+        return None
+
+    def _normalize_name(self, name: str) -> str:
+        """Lowercase a name and strip underscores, spaces and dashes"""
+        return name.lower().translate(_NAME_NOISE)
+
+    def _index_node(self, label: str, node_id: str):
+        """Record a new node for _find_node_by_name and _find_instance_node"""
+        normalized = self._normalize_name(label)
+        self._label_index.setdefault(normalized, node_id)
+        self._label_keys.append((normalized, node_id))
+        self._node_ids.add(node_id)
+        self._nodes_by_suffix.setdefault(node_id.rsplit('.', 1)[-1], []).append(node_id)
 
     def _find_node_by_name(self, name: str) -> str:
         """Find node ID by fuzzy matching the name"""
-        normalized = name.lower().replace('_', '').replace(' ', '').replace('-', '')
+        normalized = self._normalize_name(name)
+
+        # Exact normalized match first, substring match only on a miss
+        node_id = self._label_index.get(normalized)
+        if node_id:
+            return node_id
 
-        for node in self.nodes:
-            label = node['data']['label'].lower().replace('_', '').replace(' ', '').replace('-', '')
+        for label, node_id in self._label_keys:
             if normalized in label or label in normalized:
-                return node['data']['id']
+                return node_id
 
         return None
 
-    def _determine_category(self, key: str, path: str) -> str:
-        """Determine the category of a node based on keywords"""
-        key_lower = key.lower()
-        path_lower = path.lower()
-
-        # Check each category's keywords
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in key_lower or keyword in path_lower:
-                    return category
-
-        return 'other'
-
     def _extract_properties(self, value: Any) -> Dict:
         """Extract simple properties from a value"""
-        if isinstance(value, dict):
-            props = {}
-            for k, v in value.items():
-                if not self._is_complex_object(v):
-                    props[k] = v
-            return props
+        if type(value) is not dict:
+            return {'value': value}
+
+        # Same test as _is_complex_object, inlined to skip a method call per item
+        for v in value.values():
+            if type(v) is dict and any(type(vv) is dict for vv in v.values()):
+                break
+        else:
+            # Nothing to drop, share the parsed dict instead of copying it
+            return value
 
-        return {'value': value}
+        return {
+            k: v for k, v in value.items()
+            if type(v) is not dict or not any(type(vv) is dict for vv in v.values())
+        }
 
     def _is_complex_object(self, obj: Any) -> bool:
         """Check if an object is complex (has nested objects)"""
-        if not isinstance(obj, dict):
+        if type(obj) is not dict:
             return False
 
-        if isinstance(obj, list):
-            return False
+        for v in obj.values():
+            if type(v) is dict:
+                return True
 
-        return any(
-            isinstance(v, dict) and not isinstance(v, list)
-            for v in obj.values()
-        )
+        return False
 
     def _format_label(self, key: str) -> str:
         """Format a key as a display label"""
-        return key.replace('_', ' ').title()
+        # Keys like 'description' recur under many parents, share one label
+        return intern(key.replace('_', ' ').title())
 
     def _process_explicit_edges(self, edges_list: List[Dict]):
         """Process explicit edges from the JSON edges section"""
+        # Collected locally and added in one extend; generated ids keep
+        # counting from the edges that already exist
+        first_id = len(self.edges)
+        find_node = self._find_instance_node
+        reserved = self._EDGE_DEF_RESERVED
+        new_edges = []
+
         for edge_def in edges_list:
-            if not isinstance(edge_def, dict):
+            if type(edge_def) is not dict:
                 continue
 
             source = edge_def.get('source')
             target = edge_def.get('target')
             edge_type = edge_def.get('type', 'related')
-            edge_id = edge_def.get('id', f"edge-{len(self.edges)}")
+            edge_id = edge_def['id'] if 'id' in edge_def else f"edge-{first_id + len(new_edges)}"
             label = edge_def.get('label', '')
 
             if not source or not target:
                 continue
 
             # Try to find node IDs by matching the instance IDs
-            source_node_id = self._find_instance_node(source)
-            target_node_id = self._find_instance_node(target)
+            source_node_id = find_node(source)
+            target_node_id = find_node(target)
 
             if source_node_id and target_node_id:
                 # Determine edge class based on type
@@ -623,23 +653,26 @@ class OntologyParser:
                 }
 
                 # Add any additional properties from the edge definition
+                data = edge['data']
                 for key, value in edge_def.items():
-                    if key not in ['source', 'target', 'type', 'id', 'label']:
-                        edge['data'][key] = value
+                    if key not in reserved:
+                        data[key] = value
+
+                new_edges.append(edge)
 
-                self.edges.append(edge)
+        self.edges.extend(new_edges)
 
     def _find_instance_node(self, instance_id: str) -> Optional[str]:
         """Find the full node ID for an instance ID"""
         # First try exact match with root.instances prefix
         candidate = f"root.instances.{instance_id}"
-        if any(node['data']['id'] == candidate for node in self.nodes):
+        if candidate in self._node_ids:
             return candidate
 
-        # Try finding by partial match
-        for node in self.nodes:
-            node_id = node['data']['id']
-            if node_id.endswith(f".{instance_id}"):
+        # Try finding by partial match, among nodes sharing the last segment
+        suffix = f".{instance_id}"
+        for node_id in self._nodes_by_suffix.get(suffix.rsplit('.', 1)[-1], ()):
+            if node_id.endswith(suffix):
                 return node_id
 
         # If no match found, return None
@@ -656,3 +689,26 @@ class OntologyParser:
             for key, color in self.CATEGORY_COLORS.items()
             if key not in ['root', 'other']
         ]
+
+
+# Categories indexed by keyword rank, 'other' sits past the last rank
+_CATEGORIES_BY_RANK = tuple(OntologyParser.CATEGORY_KEYWORDS) + ('other',)
+
+
+@lru_cache(maxsize=4096)
+def _keyword_rank(segment: str) -> int:
+    """Rank of the earliest category with a keyword in segment, or the 'other' rank
+
+    Keys repeat across subtrees, so most segments are answered from the cache.
+    """
+    text = segment.lower()
+    for rank, (_, keywords) in enumerate(OntologyParser._CATEGORY_KEYWORDS_TUPLE):
+        for keyword in keywords:
+            if keyword in text:
+                return rank
+    return len(_CATEGORIES_BY_RANK) - 1
+
+
+def parse_ontology(json_data: Dict[str, Any]) -> Tuple[List[Dict], List[Dict]]:
+    """Parse ontology JSON with a fresh parser, sharing no state between callers"""
+    return OntologyParser().parse(json_data)
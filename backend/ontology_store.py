@@ -0,0 +1,161 @@
+"""
+Column-oriented Ontology Store
+Keeps node and edge fields in parallel lists so lookups, search and
+filtering walk flat columns instead of nested node dictionaries
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class OntologyStore:
+    """Parsed ontology laid out as a structure of arrays"""
+
+    # Node and edge dicts in the shape served to the frontend
+    nodes: List[Dict]
+    edges: List[Dict]
+
+    # Node columns, aligned with nodes
+    node_ids: List[str]
+    categories: List[str]
+    search_text: List[str]
+
+    # Edge columns, aligned with edges
+    edge_sources: List[str]
+    edge_targets: List[str]
+    edge_types: List[str]
+
+    # Indexes into the columns above
+    position_by_id: Dict[str, int]
+    out_edges: Dict[str, List[int]]
+    in_edges: Dict[str, List[int]]
+    nodes_by_category: Dict[str, List[int]]
+    trigrams: Dict[str, List[int]]
+
+    @classmethod
+    def from_graph(cls, nodes: List[Dict], edges: List[Dict]) -> 'OntologyStore':
+        """Split parsed nodes and edges into columns and build the indexes"""
+        node_ids = []
+        categories = []
+        search_text = []
+        position_by_id = {}
+        nodes_by_category = {}
+
+        for position, node in enumerate(nodes):
+            data = node['data']
+            node_id = data['id']
+            category = data['category']
+            node_ids.append(node_id)
+            categories.append(category)
+            # Label and path lowercased once, NUL keeps matches from spanning both
+            search_text.append(f"{str(data['label']).lower()}\x00{data['path'].lower()}")
+            position_by_id.setdefault(node_id, position)
+            nodes_by_category.setdefault(category, []).append(position)
+
+        edge_sources = []
+        edge_targets = []
+        edge_types = []
+        out_edges = {}
+        in_edges = {}
+
+        for position, edge in enumerate(edges):
+            data = edge['data']
+            source = data['source']
+            target = data['target']
+            edge_sources.append(source)
+            edge_targets.append(target)
+            edge_types.append(data['type'])
+            out_edges.setdefault(source, []).append(position)
+            in_edges.setdefault(target, []).append(position)
+
+        return cls(
+            nodes=nodes,
+            edges=edges,
+            node_ids=node_ids,
+            categories=categories,
+            search_text=search_text,
+            edge_sources=edge_sources,
+            edge_targets=edge_targets,
+            edge_types=edge_types,
+            position_by_id=position_by_id,
+            out_edges=out_edges,
+            in_edges=in_edges,
+            nodes_by_category=nodes_by_category,
+            trigrams=_build_trigram_index(search_text)
+        )
+
+    def get_node(self, node_id: str) -> Optional[Tuple[Dict, List[Dict], List[Dict]]]:
+        """Return (node, incoming_edges, outgoing_edges) or None if unknown"""
+        position = self.position_by_id.get(node_id)
+        if position is None:
+            return None
+
+        edges = self.edges
+        incoming = [edges[i] for i in self.in_edges.get(node_id, ())]
+        outgoing = [edges[i] for i in self.out_edges.get(node_id, ())]
+        return self.nodes[position], incoming, outgoing
+
+    def search(self, query: str) -> List[Dict]:
+        """Return nodes whose lowercased label or path contains query"""
+        search_text = self.search_text
+        nodes = self.nodes
+        return [
+            nodes[position]
+            for position in self._search_candidates(query)
+            if query in search_text[position]
+        ]
+
+    def filter(self, enabled_categories: Iterable[str]) -> Tuple[List[Dict], List[Dict]]:
+        """Return root plus nodes in the given categories, and the edges between them"""
+        buckets = self.nodes_by_category
+        enabled = frozenset(enabled_categories) | {'root'}
+
+        # Gather the requested buckets, keeping the original node order
+        positions = sorted(
+            position
+            for category in enabled
+            for position in buckets.get(category, ())
+        )
+        nodes = self.nodes
+        node_ids = self.node_ids
+        filtered_nodes = [nodes[position] for position in positions]
+        visible_ids = {node_ids[position] for position in positions}
+
+        # Only keep edges whose source and target are both visible
+        edges = self.edges
+        filtered_edges = [
+            edges[position]
+            for position, (source, target) in enumerate(zip(self.edge_sources, self.edge_targets))
+            if source in visible_ids and target in visible_ids
+        ]
+
+        return filtered_nodes, filtered_edges
+
+    def _search_candidates(self, query: str):
+        """Return node positions that may contain query, in node order"""
+        if len(query) < 3:
+            return range(len(self.nodes))
+
+        postings = []
+        for gram in {query[i:i + 3] for i in range(len(query) - 2)}:
+            positions = self.trigrams.get(gram)
+            if positions is None:
+                return []
+            postings.append(positions)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for positions in postings[1:]:
+            candidates.intersection_update(positions)
+            if not candidates:
+                return []
+        return sorted(candidates)
+
+
+def _build_trigram_index(search_text: List[str]) -> Dict[str, List[int]]:
+    """Map every 3-character substring to the positions of the strings containing it"""
+    trigrams = {}
+    for position, text in enumerate(search_text):
+        for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            trigrams.setdefault(gram, []).append(position)
+    return trigrams
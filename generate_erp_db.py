@@ -5,9 +5,12 @@ The database is consistent with the machine "IM-450T-ENGEL-2021-0721" from the e
 """
 
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import random
-import os
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from itertools import chain, islice
+from operator import itemgetter
 
 # Configuration constants
 MACHINE_ID = "IM-450T-ENGEL-2021-0721"
@@ -72,16 +75,49 @@ ORDER_STATUSES = ["scheduled", "in_progress", "completed", "delayed"]
 # Maintenance results
 MAINTENANCE_RESULTS = ["ok", "component_replaced", "adjustment_made", "issue_found"]
 
+# Seed for the shared random generator, so every run produces the same data
+RANDOM_SEED = 42
 
-def create_database(db_path="erp_mock.db"):
-    """Create the SQLite database with three tables."""
-    # Remove existing database if it exists
-    if os.path.exists(db_path):
-        os.remove(db_path)
+# Bound parameters allowed per statement by older SQLite builds
+SQLITE_MAX_VARIABLES = 999
 
-    conn = sqlite3.connect(db_path)
+# Orders joined with the material batches available at their scheduled start,
+# stored in the generated database next to the rows it is computed from
+TRACEABILITY_TABLE = (
+    """
+    CREATE TABLE mv_traceability AS
+    SELECT
+        po.order_id,
+        po.material_type,
+        po.status,
+        po.scheduled_start,
+        mb.arrival_date,
+        mb.batch_id,
+        mb.lot_number,
+        mb.quality_grade
+    FROM production_orders po
+    LEFT JOIN material_batches mb
+        ON po.material_type = mb.material_type
+        -- ISO-8601 text: a bare arrival date sorts before any time on that day
+        AND mb.arrival_date <= po.scheduled_start
+    """,
+    "CREATE INDEX idx_mv_traceability_status_start"
+    " ON mv_traceability(status, scheduled_start DESC, order_id, arrival_date)",
+)
+
+
+def create_database():
+    """Create the in-memory SQLite database with three tables."""
+    # Data is generated in memory and copied to disk once by save_database(),
+    # so the inserts never touch the journal or the file system.
+    # Transactions are managed explicitly, see main()
+    conn = sqlite3.connect(":memory:", isolation_level=None)
     cursor = conn.cursor()
 
+    # Larger pages mean fewer B-tree pages per table; set before the first
+    # table exists, and the backup carries it over to the file
+    cursor.execute("PRAGMA page_size=8192")
+
     # Create production_orders table
     cursor.execute("""
         CREATE TABLE production_orders (
@@ -95,7 +131,8 @@ def create_database(db_path="erp_mock.db"):
             actual_end TEXT,
             status TEXT NOT NULL,
             machine_id TEXT NOT NULL,
-            mold_id TEXT NOT NULL
+            mold_id TEXT NOT NULL,
+            day_ordinal INTEGER NOT NULL  -- Ordinal day of scheduled_start
         )
     """)
 
@@ -111,7 +148,8 @@ def create_database(db_path="erp_mock.db"):
             technician_name TEXT NOT NULL,
             duration_minutes INTEGER NOT NULL,
             result TEXT NOT NULL,
-            notes TEXT
+            notes TEXT,
+            day_ordinal INTEGER NOT NULL  -- Ordinal day of timestamp
         )
     """)
 
@@ -129,10 +167,69 @@ def create_database(db_path="erp_mock.db"):
         )
     """)
 
-    conn.commit()
     return conn
 
 
+def save_database(conn, db_path="erp_mock.db"):
+    """Copy the generated database to db_path, replacing any previous contents."""
+    disk = sqlite3.connect(db_path)
+    try:
+        conn.backup(disk)
+    finally:
+        disk.close()
+
+
+def bulk_insert(cursor, table, columns, rows, chunk=500):
+    """Insert rows with multi-row VALUES statements, return the number of rows."""
+    chunk = min(chunk, SQLITE_MAX_VARIABLES // len(columns))
+    group = "(" + ", ".join(["?"] * len(columns)) + ")"
+    prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    full_batch_sql = prefix + ", ".join([group] * chunk)
+
+    rows = iter(rows)
+    total = 0
+    while True:
+        batch = list(islice(rows, chunk))
+        if not batch:
+            break
+        # Full batches reuse one cached statement, only the remainder differs
+        sql = full_batch_sql if len(batch) == chunk else prefix + ", ".join([group] * len(batch))
+        cursor.execute(sql, list(chain.from_iterable(batch)))
+        total += len(batch)
+    return total
+
+
+def create_indexes(cursor):
+    """Create indexes for the example queries and gather planner statistics."""
+    # Separate statements: executescript() would commit the open transaction
+    for statement in (
+        "CREATE INDEX idx_ml_day_machine ON maintenance_logs(day_ordinal, machine_id)",
+        "CREATE INDEX idx_po_day_machine ON production_orders(day_ordinal, machine_id)",
+        "CREATE INDEX idx_po_status ON production_orders(status)",
+        "CREATE INDEX idx_mb_material ON material_batches(material_type)",
+        # Covering indexes for the grouped and joined queries in verify_db.py
+        "CREATE INDEX idx_ml_component_cover"
+        " ON maintenance_logs(component_id, task_type, duration_minutes)",
+        "CREATE INDEX idx_ml_technician_cover"
+        " ON maintenance_logs(technician_name, duration_minutes, result)",
+        "CREATE INDEX idx_mb_material_cover"
+        " ON material_batches(material_type, arrival_date, batch_id, lot_number, quality_grade)",
+        "CREATE INDEX idx_po_status_start ON production_orders(status, scheduled_start)",
+        "CREATE INDEX idx_po_material_status ON production_orders(material_type, status)",
+        "CREATE INDEX idx_po_scheduled_start ON production_orders(scheduled_start)",
+        "CREATE INDEX idx_ml_timestamp ON maintenance_logs(timestamp)",
+        "CREATE INDEX idx_mb_arrival_date ON material_batches(arrival_date)",
+        "ANALYZE",
+    ):
+        cursor.execute(statement)
+
+
+def create_traceability_table(cursor):
+    """Store the order to material batch join in mv_traceability, replacing any previous copy."""
+    for statement in ("DROP TABLE IF EXISTS mv_traceability",) + TRACEABILITY_TABLE:
+        cursor.execute(statement)
+
+
 def is_working_hours(dt):
     """Check if datetime is within working hours (06:00-22:00, Monday-Friday)."""
     return dt.weekday() < 5 and 6 <= dt.hour < 22
@@ -140,51 +237,62 @@ def is_working_hours(dt):
 
 def get_next_working_datetime(dt):
     """Get the next valid working datetime."""
-    while not is_working_hours(dt):
-        if dt.hour >= 22:
-            # Move to next day at 6 AM
-            dt = dt.replace(hour=6, minute=0, second=0) + timedelta(days=1)
-        elif dt.hour < 6:
-            # Move to 6 AM same day
-            dt = dt.replace(hour=6, minute=0, second=0)
-        else:
-            # Weekend - move to Monday 6 AM
-            days_ahead = 7 - dt.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            dt = dt.replace(hour=6, minute=0, second=0) + timedelta(days=days_ahead)
-    return dt
+    if is_working_hours(dt):
+        return dt
 
+    # Outside hours: snap to 06:00, the next day if the shift already ended,
+    # then skip a weekend to Monday
+    next_start = dt.replace(hour=6, minute=0, second=0)
+    if dt.hour >= 22:
+        next_start += timedelta(days=1)
 
-def generate_production_orders(cursor, count=50):
-    """Generate realistic production orders spanning last 3 months."""
-    print(f"\nGenerating {count} production orders...")
+    weekday = next_start.weekday()
+    if weekday >= 5:
+        next_start += timedelta(days=7 - weekday)
+    return next_start
 
+
+def production_order_rows(rng, count):
+    """Yield realistic production order rows spanning last 3 months."""
     # Start from 3 months ago
     end_date = datetime.now()
     start_date = end_date - timedelta(days=90)
 
-    orders = []
-    for i in range(1, count + 1):
+    # Draw each per-order field for all orders up front; choices() over a
+    # range is a uniform integer draw done in a single call
+    days_offsets = rng.choices(range(90), k=count)
+    parts = rng.choices(PARTS, k=count)
+    quantities = rng.choices(range(500, 5001), k=count)
+    seconds_per_part = rng.choices(range(10, 31), k=count)
+    start_hours = rng.choices(range(6, 19), k=count)
+    start_minutes = rng.choices(range(60), k=count)
+    # Statuses come from weighted tables per time regime: finished orders are
+    # 90% completed, orders that should have started are 15% delayed
+    finished_statuses = rng.choices(("completed", "delayed"), weights=(90, 10), k=count)
+    overdue_statuses = rng.choices(("delayed", "in_progress"), weights=(15, 85), k=count)
+    start_delays = rng.choices(range(-30, 61), k=count)
+    end_delays = rng.choices(range(-60, 181), k=count)
+
+    now = datetime.now()
+    for (
+        i, days_offset, part, quantity, seconds, hour, minute,
+        finished_status, overdue_status, start_delay, end_delay
+    ) in zip(
+        range(1, count + 1), days_offsets, parts, quantities, seconds_per_part, start_hours, start_minutes,
+        finished_statuses, overdue_statuses, start_delays, end_delays
+    ):
         # Random date within the range
-        days_offset = random.randint(0, 89)
         order_date = start_date + timedelta(days=days_offset)
 
-        # Select random part
-        part = random.choice(PARTS)
-
         # Generate order ID
         order_id = f"ORD-{order_date.year}-{i:05d}"
 
-        # Random quantity
-        quantity = random.randint(500, 5000)
-
         # Calculate production time (rough estimate: 10-30 seconds per part)
-        production_hours = (quantity * random.randint(10, 30)) / 3600
+        production_hours = (quantity * seconds) / 3600
 
         # Schedule start time (within working hours)
         scheduled_start = get_next_working_datetime(
-            order_date.replace(hour=random.randint(6, 18), minute=random.randint(0, 59))
+            order_date.replace(hour=hour, minute=minute)
         )
 
         # Schedule end time
@@ -192,34 +300,28 @@ def generate_production_orders(cursor, count=50):
         scheduled_end = get_next_working_datetime(scheduled_end)
 
         # Determine status based on dates
-        now = datetime.now()
         if scheduled_end < now - timedelta(days=1):
             # Completed orders (90% complete successfully, 10% delayed)
-            status = "completed" if random.random() < 0.9 else "delayed"
-            actual_start = scheduled_start + timedelta(minutes=random.randint(-30, 60))
-            actual_end = scheduled_end + timedelta(minutes=random.randint(-60, 180))
+            status = finished_status
+            actual_start = scheduled_start + timedelta(minutes=start_delay)
+            actual_end = scheduled_end + timedelta(minutes=end_delay)
         elif scheduled_start < now < scheduled_end:
             # In progress
             status = "in_progress"
-            actual_start = scheduled_start + timedelta(minutes=random.randint(-30, 60))
+            actual_start = scheduled_start + timedelta(minutes=start_delay)
             actual_end = None
         elif scheduled_start < now:
             # Should have started but might be delayed
-            if random.random() < 0.15:  # 15% delayed
-                status = "delayed"
-                actual_start = None
-                actual_end = None
-            else:
-                status = "in_progress"
-                actual_start = scheduled_start + timedelta(minutes=random.randint(-30, 60))
-                actual_end = None
+            status = overdue_status
+            actual_start = scheduled_start + timedelta(minutes=start_delay) if status == "in_progress" else None
+            actual_end = None
         else:
             # Future orders
             status = "scheduled"
             actual_start = None
             actual_end = None
 
-        orders.append((
+        yield (
             order_id,
             part["name"],
             part["material"],
@@ -230,21 +332,26 @@ def generate_production_orders(cursor, count=50):
             actual_end.isoformat() if actual_end else None,
             status,
             MACHINE_ID,
-            MOLD_ID
-        ))
+            MOLD_ID,
+            scheduled_start.toordinal()
+        )
 
-    cursor.executemany("""
-        INSERT INTO production_orders
-        (order_id, part_name, material_type, quantity, scheduled_start, scheduled_end,
-         actual_start, actual_end, status, machine_id, mold_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, orders)
 
-    print(f"✓ Created {len(orders)} production orders")
-    return len(orders)
+def generate_production_orders(cursor, rng, count=50):
+    """Generate realistic production orders spanning last 3 months."""
+    print(f"\nGenerating {count} production orders...")
+
+    # Rows stream straight from the generator into the batched inserts
+    created = bulk_insert(cursor, "production_orders", (
+        "order_id", "part_name", "material_type", "quantity", "scheduled_start", "scheduled_end",
+        "actual_start", "actual_end", "status", "machine_id", "mold_id", "day_ordinal"
+    ), production_order_rows(rng, count))
 
+    print(f"✓ Created {created} production orders")
+    return created
 
-def generate_maintenance_logs(cursor, count=120):
+
+def generate_maintenance_logs(cursor, rng, count=120):
     """Generate realistic maintenance logs spanning last 6 months."""
     print(f"\nGenerating {count} maintenance log entries...")
 
@@ -253,234 +360,266 @@ def generate_maintenance_logs(cursor, count=120):
     start_date = end_date - timedelta(days=180)
 
     logs = []
-    log_counter = 1
 
     # Calculate daily, weekly, and monthly task occurrences
     daily_tasks = ["DC001", "DC002", "DC003"]
     weekly_tasks = ["WC001", "WC002"]
     monthly_tasks = ["MC001", "MC002", "MC003"]
 
-    # Generate daily tasks (skip weekends)
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date.weekday() < 5:  # Monday-Friday
-            for task_id in daily_tasks:
-                task_info = MAINTENANCE_TASKS[task_id]
-
-                # Random time during work hours
-                log_time = current_date.replace(
-                    hour=random.randint(6, 21),
-                    minute=random.randint(0, 59)
-                )
-
-                log_id = f"MLOG-{log_time.year}-{log_counter:05d}"
-                log_counter += 1
-
-                # Determine component
-                component = task_info["component"] if task_info["component"] != MACHINE_ID else random.choice(COMPONENTS)
-
-                # Result (95% ok, 5% issues)
-                if random.random() < 0.95:
-                    result = "ok"
-                    notes = f"Routine {task_info['action'].lower()} completed successfully"
-                else:
-                    result = "issue_found"
-                    notes = f"Minor issue detected during {task_info['action'].lower()}, scheduled for follow-up"
-
-                logs.append((
-                    log_id,
-                    log_time.isoformat(),
-                    MACHINE_ID,
-                    component,
-                    task_info["type"],
-                    task_info["action"],
-                    random.choice(TECHNICIANS),
-                    task_info["duration"],
-                    result,
-                    notes
-                ))
-
-        current_date += timedelta(days=1)
-
-    # Generate weekly tasks (every Monday)
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date.weekday() == 0:  # Monday
-            for task_id in weekly_tasks:
-                task_info = MAINTENANCE_TASKS[task_id]
-
-                log_time = current_date.replace(
-                    hour=random.randint(8, 14),
-                    minute=random.randint(0, 59)
-                )
-
-                log_id = f"MLOG-{log_time.year}-{log_counter:05d}"
-                log_counter += 1
-
-                # Result (90% ok, 8% adjustment, 2% replacement)
-                rand = random.random()
-                if rand < 0.90:
-                    result = "ok"
-                    notes = f"{task_info['action']} completed, all parameters within specifications"
-                elif rand < 0.98:
-                    result = "adjustment_made"
-                    notes = f"{task_info['action']} completed, minor adjustments made"
-                else:
-                    result = "component_replaced"
-                    notes = f"{task_info['action']}: preventive component replacement performed"
-
-                logs.append((
-                    log_id,
-                    log_time.isoformat(),
-                    MACHINE_ID,
-                    task_info["component"],
-                    task_info["type"],
-                    task_info["action"],
-                    random.choice(TECHNICIANS),
-                    task_info["duration"] + random.randint(-5, 10),
-                    result,
-                    notes
-                ))
-
-        current_date += timedelta(days=1)
-
-    # Generate monthly tasks (first Monday of each month)
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date.weekday() == 0 and current_date.day <= 7:  # First Monday
-            for task_id in monthly_tasks:
-                task_info = MAINTENANCE_TASKS[task_id]
-
-                log_time = current_date.replace(
-                    hour=random.randint(9, 12),
-                    minute=random.randint(0, 59)
-                )
-
-                log_id = f"MLOG-{log_time.year}-{log_counter:05d}"
-                log_counter += 1
-
-                # Result (85% ok, 10% replacement, 5% adjustment)
-                rand = random.random()
-                if rand < 0.85:
-                    result = "ok"
-                    notes = f"{task_info['action']} completed, measurements within tolerance"
-                elif rand < 0.95:
-                    result = "component_replaced"
-                    notes = f"{task_info['action']}: component replaced as part of preventive maintenance schedule"
-                else:
-                    result = "adjustment_made"
-                    notes = f"{task_info['action']}: calibration adjustments made"
-
-                logs.append((
-                    log_id,
-                    log_time.isoformat(),
-                    MACHINE_ID,
-                    task_info["component"],
-                    task_info["type"],
-                    task_info["action"],
-                    random.choice(TECHNICIANS),
-                    task_info["duration"] + random.randint(-10, 20),
-                    result,
-                    notes
-                ))
-
-        current_date += timedelta(days=1)
-
-    # Generate corrective maintenance actions (random, less frequent)
-    num_corrective = random.randint(15, 25)
-    for _ in range(num_corrective):
-        corrective = random.choice(CORRECTIVE_ACTIONS)
+    # Notes only depend on the task and its result, so format each one once
+    task_notes = {}
+    for task_id in daily_tasks:
+        action = MAINTENANCE_TASKS[task_id]["action"]
+        task_notes[task_id, "ok"] = f"Routine {action.lower()} completed successfully"
+        task_notes[task_id, "issue_found"] = f"Minor issue detected during {action.lower()}, scheduled for follow-up"
+    for task_id in weekly_tasks:
+        action = MAINTENANCE_TASKS[task_id]["action"]
+        task_notes[task_id, "ok"] = f"{action} completed, all parameters within specifications"
+        task_notes[task_id, "adjustment_made"] = f"{action} completed, minor adjustments made"
+        task_notes[task_id, "component_replaced"] = f"{action}: preventive component replacement performed"
+    for task_id in monthly_tasks:
+        action = MAINTENANCE_TASKS[task_id]["action"]
+        task_notes[task_id, "ok"] = f"{action} completed, measurements within tolerance"
+        task_notes[task_id, "component_replaced"] = (
+            f"{action}: component replaced as part of preventive maintenance schedule"
+        )
+        task_notes[task_id, "adjustment_made"] = f"{action}: calibration adjustments made"
+    for corrective in CORRECTIVE_ACTIONS:
+        action = corrective["action"]
+        task_notes[action, "component_replaced"] = (
+            f"Corrective action: {action}. Component replaced and tested successfully"
+        )
+        task_notes[action, "adjustment_made"] = (
+            f"Corrective action: {action}. System adjusted and returned to normal operation"
+        )
+        task_notes[action, "issue_found"] = f"Corrective action: {action}. Issue documented, spare parts ordered"
+
+    num_corrective = rng.randint(15, 25)
+
+    # Pre-draw technicians and machine-level components for every log the
+    # window can produce, then hand them out in order
+    first_ordinal = start_date.toordinal()
+    last_ordinal = end_date.toordinal()
+    num_days = last_ordinal - first_ordinal + 1
+    max_logs = num_days * (len(daily_tasks) + len(weekly_tasks) + len(monthly_tasks)) + num_corrective
+    technicians = iter(rng.choices(TECHNICIANS, k=max_logs))
+    machine_components = iter(rng.choices(COMPONENTS, k=num_days))
+
+    # Daily tasks draw the same fields every day, so draw them for the whole
+    # window in one call per field (95% ok, 5% issues)
+    max_daily = num_days * len(daily_tasks)
+    daily_hours = iter(rng.choices(range(6, 22), k=max_daily))
+    daily_minutes = iter(rng.choices(range(60), k=max_daily))
+    daily_results = iter(rng.choices(("ok", "issue_found"), weights=(95, 5), k=max_daily))
+
+    # Generate corrective maintenance actions (random, less frequent) first,
+    # so the day walk below knows how many of them precede each day
+    # Pair each action with its duration range once, then draw all of them
+    corrective_choices = [
+        (corrective, range(corrective["duration_range"][0], corrective["duration_range"][1] + 1))
+        for corrective in CORRECTIVE_ACTIONS
+    ]
+    corrective_logs = []
+    corrective_days = []
+    for corrective, duration_range in rng.choices(corrective_choices, k=num_corrective):
 
         # Random date
-        days_offset = random.randint(0, 179)
+        days_offset = rng.randint(0, 179)
         log_date = start_date + timedelta(days=days_offset)
 
         # During working hours
         log_time = get_next_working_datetime(
-            log_date.replace(hour=random.randint(6, 20), minute=random.randint(0, 59))
+            log_date.replace(hour=rng.randint(6, 20), minute=rng.randint(0, 59))
         )
 
-        log_id = f"MLOG-{log_time.year}-{log_counter:05d}"
-        log_counter += 1
-
-        duration = random.randint(*corrective["duration_range"])
+        duration = rng.choice(duration_range)
 
         # Result (70% component replaced, 20% adjustment, 10% issue found but deferred)
-        rand = random.random()
+        rand = rng.random()
         if rand < 0.70:
             result = "component_replaced"
-            notes = f"Corrective action: {corrective['action']}. Component replaced and tested successfully"
         elif rand < 0.90:
             result = "adjustment_made"
-            notes = f"Corrective action: {corrective['action']}. System adjusted and returned to normal operation"
         else:
             result = "issue_found"
-            notes = f"Corrective action: {corrective['action']}. Issue documented, spare parts ordered"
 
-        logs.append((
-            log_id,
+        notes = task_notes[corrective["action"], result]
+
+        corrective_days.append(log_time.toordinal())
+        corrective_logs.append((
             log_time.isoformat(),
             MACHINE_ID,
             corrective["component"],
             "corrective",
             corrective["action"],
-            random.choice(TECHNICIANS),
+            next(technicians),
             duration,
             result,
-            notes
+            notes,
+            log_time.toordinal()
         ))
 
-    # Limit to requested count and sort by timestamp
-    logs.sort(key=lambda x: x[1])
-    logs = logs[:count]
-
-    cursor.executemany("""
-        INSERT INTO maintenance_logs
-        (log_id, timestamp, machine_id, component_id, task_type, action_performed,
-         technician_name, duration_minutes, result, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, logs)
-
-    print(f"✓ Created {len(logs)} maintenance log entries")
-    return len(logs)
-
-
-def generate_material_batches(cursor, count=30):
-    """Generate realistic material batch records spanning last 4 months."""
-    print(f"\nGenerating {count} material batch records...")
-
+    corrective_days.sort()
+
+    # Walk the window once by ordinal day; date(1, 1, 1) has ordinal 1 and
+    # is a Monday, so the weekday falls out of the ordinal directly
+    for ordinal in range(first_ordinal, last_ordinal + 1):
+        # Only the earliest `count` logs are kept: once the days walked so far
+        # hold that many, every later log would be cut anyway
+        if len(logs) + bisect_left(corrective_days, ordinal) >= count:
+            break
+
+        weekday = (ordinal - 1) % 7
+        if weekday >= 5:  # Skip weekends
+            continue
+
+        # Scheduled logs fall on this day at whole minutes, so their ISO
+        # timestamps share the date prefix
+        current_date = date.fromordinal(ordinal)
+        date_prefix = f"{current_date.isoformat()}T"
+
+        # Daily tasks (Monday-Friday)
+        for task_id in daily_tasks:
+            task_info = MAINTENANCE_TASKS[task_id]
+
+            # Random time during work hours
+            timestamp = f"{date_prefix}{next(daily_hours):02d}:{next(daily_minutes):02d}:00"
+
+            # Determine component
+            component = task_info["component"] if task_info["component"] != MACHINE_ID else next(machine_components)
+
+            result = next(daily_results)
+            notes = task_notes[task_id, result]
+
+            logs.append((
+                timestamp,
+                MACHINE_ID,
+                component,
+                task_info["type"],
+                task_info["action"],
+                next(technicians),
+                task_info["duration"],
+                result,
+                notes,
+                ordinal
+            ))
+
+        if weekday != 0:
+            continue
+
+        # Weekly tasks (every Monday)
+        for task_id in weekly_tasks:
+            task_info = MAINTENANCE_TASKS[task_id]
+
+            timestamp = f"{date_prefix}{rng.randint(8, 14):02d}:{rng.randint(0, 59):02d}:00"
+
+            # Result (90% ok, 8% adjustment, 2% replacement)
+            rand = rng.random()
+            if rand < 0.90:
+                result = "ok"
+            elif rand < 0.98:
+                result = "adjustment_made"
+            else:
+                result = "component_replaced"
+
+            notes = task_notes[task_id, result]
+
+            logs.append((
+                timestamp,
+                MACHINE_ID,
+                task_info["component"],
+                task_info["type"],
+                task_info["action"],
+                next(technicians),
+                task_info["duration"] + rng.randint(-5, 10),
+                result,
+                notes,
+                ordinal
+            ))
+
+        if current_date.day > 7:
+            continue
+
+        # Monthly tasks (first Monday of each month)
+        for task_id in monthly_tasks:
+            task_info = MAINTENANCE_TASKS[task_id]
+
+            timestamp = f"{date_prefix}{rng.randint(9, 12):02d}:{rng.randint(0, 59):02d}:00"
+
+            # Result (85% ok, 10% replacement, 5% adjustment)
+            rand = rng.random()
+            if rand < 0.85:
+                result = "ok"
+            elif rand < 0.95:
+                result = "component_replaced"
+            else:
+                result = "adjustment_made"
+
+            notes = task_notes[task_id, result]
+
+            logs.append((
+                timestamp,
+                MACHINE_ID,
+                task_info["component"],
+                task_info["type"],
+                task_info["action"],
+                next(technicians),
+                task_info["duration"] + rng.randint(-10, 20),
+                result,
+                notes,
+                ordinal
+            ))
+
+    # Limit to requested count and sort by timestamp, then number the
+    # kept logs in timestamp order
+    logs.extend(corrective_logs)
+    logs.sort(key=itemgetter(0))
+
+    # Sorting needs the full list, but the numbered rows can stream into the inserts
+    created = bulk_insert(cursor, "maintenance_logs", (
+        "log_id", "timestamp", "machine_id", "component_id", "task_type", "action_performed",
+        "technician_name", "duration_minutes", "result", "notes", "day_ordinal"
+    ), (
+        (f"MLOG-{row[0][:4]}-{log_number:05d}",) + row
+        for log_number, row in enumerate(islice(logs, count), 1)
+    ))
+
+    print(f"✓ Created {created} maintenance log entries")
+    return created
+
+
+def material_batch_rows(rng, count):
+    """Yield realistic material batch rows spanning last 4 months."""
     # Start from 4 months ago
     end_date = datetime.now()
     start_date = end_date - timedelta(days=120)
 
-    batches = []
-    for i in range(1, count + 1):
+    # Draw each per-batch field for all batches up front
+    days_offsets = rng.choices(range(120), k=count)
+    material_types = rng.choices(["PP", "ABS"], k=count)
+    suppliers = rng.choices(SUPPLIERS, k=count)
+    lot_suffixes = rng.choices(range(100, 1000), k=count)
+    # 80% grade A, 20% grade B
+    quality_grades = rng.choices(QUALITY_GRADES, weights=(80, 20), k=count)
+    storage_locations = rng.choices(STORAGE_LOCATIONS, k=count)
+
+    for i, days_offset, material_type, supplier, lot_suffix, quality_grade, storage_location in zip(
+        range(1, count + 1), days_offsets, material_types, suppliers, lot_suffixes, quality_grades,
+        storage_locations
+    ):
         # Random arrival date
-        days_offset = random.randint(0, 119)
         arrival_date = start_date + timedelta(days=days_offset)
 
         # Generate batch ID
         batch_id = f"MAT-{arrival_date.year}-{i:05d}"
 
-        # Random material type
-        material_type = random.choice(["PP", "ABS"])
-
-        # Random supplier
-        supplier = random.choice(SUPPLIERS)
-
         # Random quantity (500-2000 kg)
-        quantity_kg = round(random.uniform(500, 2000), 2)
+        quantity_kg = round(rng.uniform(500, 2000), 2)
 
         # Generate lot number
-        lot_number = f"LOT-{arrival_date.strftime('%Y%m%d')}-{random.randint(100, 999)}"
-
-        # Random quality grade (80% A, 20% B)
-        quality_grade = "A" if random.random() < 0.8 else "B"
-
-        # Random storage location
-        storage_location = random.choice(STORAGE_LOCATIONS)
+        lot_number = f"LOT-{arrival_date.strftime('%Y%m%d')}-{lot_suffix}"
 
-        batches.append((
+        yield (
             batch_id,
             material_type,
             supplier,
@@ -489,17 +628,20 @@ def generate_material_batches(cursor, count=30):
             lot_number,
             quality_grade,
             storage_location
-        ))
+        )
+
 
-    cursor.executemany("""
-        INSERT INTO material_batches
-        (batch_id, material_type, supplier, quantity_kg, arrival_date, lot_number,
-         quality_grade, storage_location)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, batches)
+def generate_material_batches(cursor, rng, count=30):
+    """Generate realistic material batch records spanning last 4 months."""
+    print(f"\nGenerating {count} material batch records...")
+
+    created = bulk_insert(cursor, "material_batches", (
+        "batch_id", "material_type", "supplier", "quantity_kg", "arrival_date", "lot_number",
+        "quality_grade", "storage_location"
+    ), material_batch_rows(rng, count))
 
-    print(f"✓ Created {len(batches)} material batch records")
-    return len(batches)
+    print(f"✓ Created {created} material batch records")
+    return created
 
 
 def print_summary_statistics(conn):
@@ -510,66 +652,64 @@ def print_summary_statistics(conn):
     print("DATABASE SUMMARY STATISTICS")
     print("="*70)
 
+    # One scan per table; the per-column breakdowns are counted in Python
     # Production orders statistics
+    cursor.execute("SELECT status, material_type, quantity FROM production_orders")
+    orders = cursor.fetchall()
     print("\n📦 PRODUCTION ORDERS:")
-    cursor.execute("SELECT COUNT(*) FROM production_orders")
-    print(f"   Total orders: {cursor.fetchone()[0]}")
+    print(f"   Total orders: {len(orders)}")
 
-    cursor.execute("SELECT status, COUNT(*) FROM production_orders GROUP BY status")
-    for status, count in cursor.fetchall():
+    for status, count in sorted(Counter(row[0] for row in orders).items()):
         print(f"   - {status}: {count}")
 
-    cursor.execute("SELECT material_type, COUNT(*) FROM production_orders GROUP BY material_type")
     print("\n   Orders by material:")
-    for material, count in cursor.fetchall():
+    for material, count in sorted(Counter(row[1] for row in orders).items()):
         print(f"   - {material}: {count}")
 
-    cursor.execute("SELECT SUM(quantity) FROM production_orders")
-    total_parts = cursor.fetchone()[0]
+    total_parts = sum(row[2] for row in orders)
     print(f"\n   Total parts produced/scheduled: {total_parts:,}")
 
     # Maintenance logs statistics
+    cursor.execute("SELECT task_type, result, technician_name, duration_minutes FROM maintenance_logs")
+    logs = cursor.fetchall()
     print("\n🔧 MAINTENANCE LOGS:")
-    cursor.execute("SELECT COUNT(*) FROM maintenance_logs")
-    print(f"   Total log entries: {cursor.fetchone()[0]}")
+    print(f"   Total log entries: {len(logs)}")
 
-    cursor.execute("SELECT task_type, COUNT(*) FROM maintenance_logs GROUP BY task_type")
     print("\n   Logs by type:")
-    for task_type, count in cursor.fetchall():
+    for task_type, count in sorted(Counter(row[0] for row in logs).items()):
         print(f"   - {task_type}: {count}")
 
-    cursor.execute("SELECT result, COUNT(*) FROM maintenance_logs GROUP BY result")
     print("\n   Logs by result:")
-    for result, count in cursor.fetchall():
+    for result, count in sorted(Counter(row[1] for row in logs).items()):
         print(f"   - {result}: {count}")
 
-    cursor.execute("SELECT technician_name, COUNT(*) FROM maintenance_logs GROUP BY technician_name")
     print("\n   Logs by technician:")
-    for tech, count in cursor.fetchall():
+    for tech, count in sorted(Counter(row[2] for row in logs).items()):
         print(f"   - {tech}: {count}")
 
-    cursor.execute("SELECT SUM(duration_minutes) FROM maintenance_logs")
-    total_duration = cursor.fetchone()[0]
+    total_duration = sum(row[3] for row in logs)
     print(f"\n   Total maintenance time: {total_duration:,} minutes ({total_duration/60:.1f} hours)")
 
     # Material batches statistics
+    cursor.execute("SELECT material_type, quantity_kg, supplier, quality_grade FROM material_batches")
+    batches = cursor.fetchall()
     print("\n📊 MATERIAL BATCHES:")
-    cursor.execute("SELECT COUNT(*) FROM material_batches")
-    print(f"   Total batches: {cursor.fetchone()[0]}")
+    print(f"   Total batches: {len(batches)}")
 
-    cursor.execute("SELECT material_type, COUNT(*), SUM(quantity_kg) FROM material_batches GROUP BY material_type")
+    kg_by_material = defaultdict(float)
+    for row in batches:
+        kg_by_material[row[0]] += row[1]
+    batches_by_material = Counter(row[0] for row in batches)
     print("\n   Batches by material:")
-    for material, count, total_kg in cursor.fetchall():
-        print(f"   - {material}: {count} batches, {total_kg:,.2f} kg")
+    for material, count in sorted(batches_by_material.items()):
+        print(f"   - {material}: {count} batches, {kg_by_material[material]:,.2f} kg")
 
-    cursor.execute("SELECT supplier, COUNT(*) FROM material_batches GROUP BY supplier")
     print("\n   Batches by supplier:")
-    for supplier, count in cursor.fetchall():
+    for supplier, count in sorted(Counter(row[2] for row in batches).items()):
         print(f"   - {supplier}: {count}")
 
-    cursor.execute("SELECT quality_grade, COUNT(*) FROM material_batches GROUP BY quality_grade")
     print("\n   Batches by quality grade:")
-    for grade, count in cursor.fetchall():
+    for grade, count in sorted(Counter(row[3] for row in batches).items()):
         print(f"   - Grade {grade}: {count}")
 
     print("\n" + "="*70)
@@ -597,8 +737,15 @@ def demonstrate_queries(conn):
         ml.result
     FROM production_orders po
     LEFT JOIN maintenance_logs ml
-        ON DATE(po.scheduled_start) = DATE(ml.timestamp)
-        AND ml.machine_id = po.machine_id
+        ON ml.rowid = (
+            -- At most one log per order: the first one on the same machine that day
+            SELECT first_log.rowid
+            FROM maintenance_logs first_log
+            WHERE first_log.day_ordinal = po.day_ordinal
+                AND first_log.machine_id = po.machine_id
+            ORDER BY first_log.timestamp
+            LIMIT 1
+        )
     WHERE po.status IN ('completed', 'in_progress')
     ORDER BY po.scheduled_start DESC
     LIMIT 10
@@ -651,7 +798,7 @@ def demonstrate_queries(conn):
 
     query = """
     SELECT
-        ml.timestamp,
+        strftime('%Y-%m-%d %H:%M', ml.timestamp) as log_time,
         ml.component_id,
         ml.action_performed,
         ml.duration_minutes,
@@ -659,7 +806,7 @@ def demonstrate_queries(conn):
     FROM maintenance_logs ml
     LEFT JOIN production_orders po
         ON ml.machine_id = po.machine_id
-        AND DATE(ml.timestamp) = DATE(po.scheduled_start)
+        AND ml.day_ordinal = po.day_ordinal
         AND po.status IN ('in_progress', 'delayed')
     WHERE ml.task_type = 'corrective'
     GROUP BY ml.log_id
@@ -674,8 +821,7 @@ def demonstrate_queries(conn):
     print("-" * 105)
 
     for row in results:
-        timestamp, component, action, duration, affected = row
-        date_str = datetime.fromisoformat(timestamp).strftime("%Y-%m-%d %H:%M")
+        date_str, component, action, duration, affected = row
         action_short = action[:32] + "..." if len(action) > 35 else action
         print(f"{date_str:<20} {component:<15} {action_short:<35} {duration:>3} min     {affected}")
 
@@ -693,16 +839,25 @@ def main():
 
     # Create database and tables
     print("\nCreating database structure...")
-    conn = create_database("erp_mock.db")
+    conn = create_database()
     print("✓ Database and tables created successfully")
 
-    # Generate data
-    generate_production_orders(conn.cursor(), count=50)
-    generate_maintenance_logs(conn.cursor(), count=120)
-    generate_material_batches(conn.cursor(), count=30)
-
-    # Commit all changes
+    # Generate data in a single transaction
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    rng = random.Random(RANDOM_SEED)
+    generate_production_orders(cursor, rng, count=50)
+    generate_maintenance_logs(cursor, rng, count=120)
+    generate_material_batches(cursor, rng, count=30)
+
+    # Derived tables and indexes after the bulk insert, then refresh
+    # planner statistics
+    create_traceability_table(cursor)
+    create_indexes(cursor)
+
+    # Commit all changes and write the database file in one page copy
     conn.commit()
+    save_database(conn, "erp_mock.db")
 
     # Print statistics
     print_summary_statistics(conn)